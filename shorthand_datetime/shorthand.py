@@ -5,15 +5,49 @@
 from __future__ import annotations
 
 import datetime
+import functools
 import logging
-import re
 import warnings
-from typing import Optional, Union
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
 
 import pytz
 
-# Configure logging
-logging.basicConfig(format="%(message)s", level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Units that can be used both as relative terms and as rounding targets
+_UNITS = frozenset("smhHdWMY")
+
+# Timedelta of a single unit, for the units with a fixed length
+_UNIT_TIMEDELTAS: Dict[str, datetime.timedelta] = {
+    "s": datetime.timedelta(seconds=1),
+    "m": datetime.timedelta(minutes=1),
+    "h": datetime.timedelta(hours=1),
+    "H": datetime.timedelta(hours=1),
+    "d": datetime.timedelta(days=1),
+    "W": datetime.timedelta(weeks=1),
+}
+
+# Months and years are approximated by their average length in weeks
+_WEEKS_PER_UNIT: Dict[str, float] = {"M": 4.34524, "Y": 52.177142857142854}
+
+# Precomputed timedeltas for small month and year values, which otherwise need
+# a float multiplication and normalization on every call.
+_APPROX_TIMEDELTAS: Dict[str, Dict[int, datetime.timedelta]] = {
+    unit: {n: datetime.timedelta(weeks=n * weeks) for n in range(-24, 25)} for unit, weeks in _WEEKS_PER_UNIT.items()
+}
+
+# Keyword arguments of datetime.replace that round down to each target. Weeks
+# also move the date back to Monday, which _roundtimestamp handles separately.
+_ROUND_KWARGS: Dict[str, Dict[str, Any]] = {
+    "s": {"microsecond": 0},
+    "m": {"second": 0, "microsecond": 0},
+    "h": {"minute": 0, "second": 0, "microsecond": 0},
+    "H": {"minute": 0, "second": 0, "microsecond": 0},
+    "d": {"hour": 0, "minute": 0, "second": 0, "microsecond": 0},
+    "W": {"hour": 0, "minute": 0, "second": 0, "microsecond": 0},
+    "M": {"day": 1, "hour": 0, "minute": 0, "second": 0, "microsecond": 0},
+    "Y": {"month": 1, "day": 1, "hour": 0, "minute": 0, "second": 0, "microsecond": 0},
+}
 
 
 def _roundtimestamp(dt: datetime.datetime, target: str) -> datetime.datetime:
@@ -47,22 +81,18 @@ def _roundtimestamp(dt: datetime.datetime, target: str) -> datetime.datetime:
     datetime.datetime(2024, 1, 1, 0, 0)
     """
 
-    if target == "s":
-        return dt.replace(microsecond=0)
-    elif target == "m":
-        return dt.replace(second=0, microsecond=0)
-    elif target in ["h", "H"]:
-        return dt.replace(minute=0, second=0, microsecond=0)
-    elif target == "d":
-        return dt.replace(hour=0, minute=0, second=0, microsecond=0)
-    elif target == "W":
-        return dt.replace(hour=0, minute=0, second=0, microsecond=0) - datetime.timedelta(days=dt.weekday())
-    elif target == "M":
-        return dt.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    elif target == "Y":
-        return dt.replace(day=1, month=1, hour=0, minute=0, second=0, microsecond=0)
+    if target == "W":
+        # Jump to midnight of the Monday of the same week in a single replace
+        monday = datetime.date.fromordinal(dt.toordinal() - dt.weekday())
+        return dt.replace(
+            year=monday.year, month=monday.month, day=monday.day, hour=0, minute=0, second=0, microsecond=0
+        )
 
-    raise ValueError(f"Invalid target '{target}'. " "Must be 's', 'm', 'h', 'H', 'd', 'W', 'M' or 'Y'")
+    try:
+        kwargs = _ROUND_KWARGS[target]
+    except KeyError:
+        raise ValueError(f"Invalid target '{target}'. " "Must be 's', 'm', 'h', 'H', 'd', 'W', 'M' or 'Y'") from None
+    return dt.replace(**kwargs)
 
 
 def _timedelta(value: Union[int, float, str], unit: str) -> datetime.timedelta:
@@ -98,27 +128,192 @@ def _timedelta(value: Union[int, float, str], unit: str) -> datetime.timedelta:
     >>> _timedelta(1, 'Y')
     datetime.timedelta(days=365, seconds=20952)
     """
-    if unit == "s":
-        return datetime.timedelta(seconds=int(value))
-    elif unit == "m":
-        return datetime.timedelta(minutes=int(value))
-    elif unit in ["h", "H"]:
-        return datetime.timedelta(hours=int(value))
-    elif unit == "d":
-        return datetime.timedelta(days=int(value))
-    elif unit == "W":
-        return datetime.timedelta(weeks=int(value))
-    elif unit == "M":
-        if int(value) >= 601 or int(value) <= -601:
-            raise ValueError(f"Value out of range. Please enter a value between -600 and 600. Value entered: {value}")
-        return datetime.timedelta(weeks=int(value) * 4.34524)
-    elif unit == "Y":
-        return datetime.timedelta(weeks=int(value) * 52.177142857142854)
-    else:
+    unit_timedelta = _UNIT_TIMEDELTAS.get(unit)
+    if unit_timedelta is not None:
+        return int(value) * unit_timedelta
+
+    weeks = _WEEKS_PER_UNIT.get(unit)
+    if weeks is None:
         raise ValueError(f"Invalid unit '{unit}'. Must be 'd', 'W', 'M' or 'Y'")
 
+    v = int(value)
+    if unit == "M" and (v >= 601 or v <= -601):
+        raise ValueError(f"Value out of range. Please enter a value between -600 and 600. Value entered: {value}")
+
+    cached = _APPROX_TIMEDELTAS[unit].get(v)
+    if cached is not None:
+        return cached
+    return datetime.timedelta(weeks=v * weeks)
+
+
+class _InvalidShorthandError(ValueError):
+    """Raised for malformed shorthand datetime strings, which
+    :func:`parse_shorthand_datetime` reports by returning None"""
+
+
+def _scan(datestr: str) -> datetime.timedelta:
+    """
+    Scans the relative part of a shorthand datetime string in a single left
+    to right pass and returns the sum of its signed terms
+
+    Parameters
+    ----------
+    datestr : str
+        The shorthand datetime string, starting with 'now' and stripped of
+        whitespace, timezone and rounding target
+
+    Returns
+    -------
+    datetime.timedelta
+        The sum of the timedeltas of all terms
+
+    Raises
+    ------
+    _InvalidShorthandError
+        If the string contains a character that is not a sign, digit or unit
+    ValueError
+        If a value is out of range for its unit
+
+    Examples
+    --------
+    >>> _scan('now-6d')
+    datetime.timedelta(days=-6)
+    >>> _scan('now-1W+1d')
+    datetime.timedelta(days=-6)
+    >>> _scan('now-h')
+    datetime.timedelta(days=-1, seconds=82800)
+    >>> _scan('now-1.5d')
+    Traceback (most recent call last):
+    ...
+    shorthand_datetime.shorthand._InvalidShorthandError: Invalid date string. Unexpected character '.'
+    """
+    delta = datetime.timedelta()
+    i = 3  # Skip the 'now' prefix
+    n = len(datestr)
+    while i < n:
+        sign = 1
+        if datestr[i] in "+-":
+            if datestr[i] == "-":
+                sign = -1
+            i += 1
+        start = i
+        value = 0
+        while i < n and "0" <= datestr[i] <= "9":
+            value = value * 10 + ord(datestr[i]) - 48
+            i += 1
+        if i == n:
+            # A dangling sign or value without unit is ignored
+            break
+        if i == start:
+            value = 1
+        if datestr[i] not in _UNITS:
+            raise _InvalidShorthandError(f"Invalid date string. Unexpected character '{datestr[i]}'")
+        delta += _timedelta(sign * value, datestr[i])
+        i += 1
+    return delta
+
+
+class _Spec(NamedTuple):
+    """Parsed form of a shorthand datetime string, independent of the current
+    time and timezone"""
+
+    delta: datetime.timedelta
+    target: Optional[str] = None
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_spec(datestr: str) -> Optional[_Spec]:
+    """
+    Parses a shorthand datetime string, stripped of its timezone, into the
+    sum of its relative terms and its rounding target. Results are cached per
+    unique string so that repeated shorthands are only parsed and summed once.
+
+    Parameters
+    ----------
+    datestr : str
+        The shorthand datetime string without quoted timezone
+
+    Returns
+    -------
+    Optional[_Spec]
+        The total timedelta and target, or None if the string is not a
+        shorthand datetime string
+
+    Raises
+    ------
+    _InvalidShorthandError
+        If the string is a malformed shorthand datetime string
+    ValueError
+        If a value is out of range for its unit
+
+    Examples
+    --------
+    >>> _parse_spec('now-6d/d')
+    _Spec(delta=datetime.timedelta(days=-6), target='d')
+    >>> _parse_spec('-1W + 1d')
+    _Spec(delta=datetime.timedelta(days=-6), target=None)
+    >>> _parse_spec('yesterday') is None
+    True
+    """
+    datestr = "".join(datestr.split())  # Remove spaces, tabs and linebreaks
+
+    target = None
+    slash = datestr.find("/")
+    if slash != -1:
+        # Check if there are more than 1 "/" in the string
+        if datestr.find("/", slash + 1) != -1:
+            raise _InvalidShorthandError("Invalid date string. Only one '/' is allowed")
+
+        # Check that "/" is always the second to last character, and it is
+        # followed by a valid target
+        if slash == len(datestr) - 1:
+            raise _InvalidShorthandError("Invalid date string. '/' must be followed by a " "valid target")
+        if slash != len(datestr) - 2:
+            raise _InvalidShorthandError("Invalid date string. '/' must be second to last " "character")
+        if datestr[-1] not in _UNITS:
+            raise _InvalidShorthandError("Invalid date string. '/' must be followed by a " "valid target")
 
-def parse_shorthand_datetime(datestr: str, tz: Optional[str] = None) -> Optional[datetime.datetime]:
+        # Strip the target and the "/" from the datestr
+        target = datestr[-1]
+        datestr = datestr[:slash]
+
+    if not datestr.startswith("now"):
+        if datestr.startswith(("-", "+")):
+            datestr = "now" + datestr
+        else:
+            return None
+
+    # Relative datetime string in relation to current day
+    return _Spec(_scan(datestr), target)
+
+
+def _fast_path(
+    delta: datetime.timedelta, target: Optional[str] = None
+) -> Callable[[datetime.datetime], datetime.datetime]:
+    """Returns a function that shifts a datetime by ``delta`` and, if given,
+    rounds it to ``target``"""
+    if target is None:
+        return lambda dt: dt + delta
+    return lambda dt: _roundtimestamp(dt + delta, target)
+
+
+# Precomputed evaluators for the most common shorthands, e.g. 'now/d', 'now-7d'
+# or 'now-1M/M', so that these skip parsing altogether. Bare 'now' is handled
+# before the lookup.
+_FAST_PATHS: Dict[str, Callable[[datetime.datetime], datetime.datetime]] = {}
+for _target in _ROUND_KWARGS:
+    _FAST_PATHS[f"now/{_target}"] = _fast_path(datetime.timedelta(), _target)
+for _unit in "dWMY":
+    for _value in range(-31, 32):
+        _delta = _timedelta(_value, _unit)
+        _FAST_PATHS[f"now{_value:+d}{_unit}"] = _fast_path(_delta)
+        _FAST_PATHS[f"now{_value:+d}{_unit}/{_unit}"] = _fast_path(_delta, _unit)
+del _target, _unit, _value, _delta
+
+
+def parse_shorthand_datetime(
+    datestr: str, tz: Optional[str] = None, now: Optional[datetime.datetime] = None
+) -> Optional[datetime.datetime]:
     """Parse a shorthand datetime string and return a datetime object. By
     shorthand datetime string we mean a string that can be used to represent
     a datetime in a more human readable way. This function is inspired by
@@ -133,7 +328,7 @@ def parse_shorthand_datetime(datestr: str, tz: Optional[str] = None) -> Optional
     - 'now/d' : current datetime rounded to the day
     - 'now/M' : current datetime rounded to the month
 
-    .. note:: The function discards any spaces in the input string, therefore
+    .. note:: The function discards any whitespace in the input string, therefore
               'now - 6d / d' is equivalent to 'now-6d/d'
 
     Parameters
@@ -142,6 +337,10 @@ def parse_shorthand_datetime(datestr: str, tz: Optional[str] = None) -> Optional
         The shorthand datetime string
     tz : Optional[str]
         The timezone to use. If None, UTC is used
+    now : Optional[datetime.datetime]
+        The datetime to resolve 'now' to. If None, the current time is used.
+        It is converted to the timezone with ``datetime.astimezone``, so a
+        naive datetime is taken to be in local time
 
     Returns
     -------
@@ -161,85 +360,159 @@ def parse_shorthand_datetime(datestr: str, tz: Optional[str] = None) -> Optional
     datetime.datetime(2024, 6, 1, 0, 0)
     """
 
+    return _parse_shorthand_datetime(datestr, tz, now)
+
+
+def parse_shorthand_datetime_batch(
+    datestrs: Iterable[str], tz: Optional[str] = None, now: Optional[datetime.datetime] = None
+) -> List[Optional[datetime.datetime]]:
+    """Parse a sequence of shorthand datetime strings against the same current
+    time. The clock is read once for the whole batch, so e.g. 'now' and
+    'now/s' resolve to the same instant, and repeated shorthands are only
+    resolved once.
+
+    Parameters
+    ----------
+    datestrs : Iterable[str]
+        The shorthand datetime strings
+    tz : Optional[str]
+        The timezone to use. If None, UTC is used
+    now : Optional[datetime.datetime]
+        The datetime to resolve 'now' to. If None, the current time is read
+        once for the whole batch
+
+    Returns
+    -------
+    List[Optional[datetime.datetime]]
+        The timezone aware datetime object for each string that can be parsed,
+        None for the others
+
+    Raises
+    ------
+    ValueError
+        If a value is out of range for its unit, e.g. 'now-700M'. This aborts
+        the whole batch
+
+    Examples
+    --------
+    >>> now = datetime.datetime(2024, 7, 21, 12, 30, tzinfo=pytz.utc)
+    >>> parse_shorthand_datetime_batch(['now-6d/d', 'now-1W', 'yesterday'], now=now)
+    [datetime.datetime(2024, 7, 15, 0, 0, tzinfo=<UTC>), datetime.datetime(2024, 7, 14, 12, 30, tzinfo=<UTC>), None]
+    """
+    if now is None:
+        now = datetime.datetime.now(pytz.utc)
+    # Every string resolves against the same 'now', so duplicates share a result
+    results: Dict[str, Optional[datetime.datetime]] = {}
+    parsed = []
+    for datestr in datestrs:
+        try:
+            dt = results[datestr]
+        except KeyError:
+            dt = results[datestr] = _parse_shorthand_datetime(datestr, tz, now)
+        parsed.append(dt)
+    return parsed
+
+
+def _parse_shorthand_datetime(
+    datestr: str, tz: Optional[str], now: Optional[datetime.datetime]
+) -> Optional[datetime.datetime]:
+    """Implementation of :func:`parse_shorthand_datetime` that resolves the
+    shorthand against ``now`` if given, or against the current time otherwise"""
+
+    # Bare 'now' is the most common input, resolve it before any other work
+    if datestr.strip() == "now":
+        return _current_time(_get_timezone(tz) if tz is not None else pytz.utc, now)
+
     # Check if the timezone string contains text between quotes
     if '"' in datestr or "'" in datestr:
-        match = re.search(r'["\'](.*?)["\']', datestr)
-        if match:
+        datestr, quoted_tz = _split_quoted_timezone(datestr)
+        if quoted_tz is not None:
             if tz is not None:
                 warnings.warn(
-                    f"\33[31mTimezone passed as argument {tz}. "
-                    f"Ignoring timezone in date string {match.group(1)}\33[0m"
+                    f"\33[31mTimezone passed as argument {tz}. Ignoring timezone in date string {quoted_tz}\33[0m"
                 )
             else:
-                tz = match.group(1)
-            datestr = datestr.replace(f'"{match.group(1)}"', "").replace(f"'{match.group(1)}'", "")
+                tz = quoted_tz
+
+    # Whitespace is discarded anywhere in the string, e.g. 'n o w - 1d'
+    datestr = "".join(datestr.split())
+
+    # Reject strings that cannot be a shorthand before any further work, which
+    # also keeps them out of the parse cache
+    if "now" not in datestr and not datestr.startswith(("-", "+")):
+        return None
 
     if tz is None:
         tz = "UTC"
 
     timezone = _get_timezone(tz)
 
-    valid_targets = ["s", "m", "h", "H", "d", "W", "M", "Y"]
-
-    dt = datetime.datetime.now(timezone)
-
-    if datestr == "now":
-        return dt
+    fast_path = _FAST_PATHS.get(datestr)
+    if fast_path is not None:
+        return fast_path(_current_time(timezone, now))
 
-    datestr = datestr.replace(" ", "")  # Remove linebreaks
-    # Check if there are more than 1 "/" in the string
-    if datestr.count("/") > 1:
-        logging.warning("Invalid date string. Only one '/' is allowed")
+    try:
+        spec = _parse_spec(datestr)
+    except _InvalidShorthandError as err:
+        logger.warning("%s", err)
+        return None
+    if spec is None:
         return None
 
-    # Check that "/", if there, is always the second to last character,
-    # and it is followed by a valid target
-    if "/" in datestr:
-        if datestr[-1] == "/":
-            logging.warning("Invalid date string. '/' must be followed by a " "valid target")
-            return None
-        if datestr[-2] != "/":
-            logging.warning("Invalid date string. '/' must be second to last " "character")
-            return None
-        if datestr[-1] not in valid_targets:
-            logging.warning("Invalid date string. '/' must be followed by a " "valid target")
-            return None
+    # Only read the clock once the string is known to be valid
+    dt = _current_time(timezone, now) + spec.delta
 
-    target = None
-    if "/" in datestr:
-        target = [datestr.split("/")[1][0]]
+    if spec.target is not None:
+        dt = _roundtimestamp(dt, spec.target)
 
-        # Strip the target and the "/" from the datestr
-        datestr = datestr.split("/")[0]
+    return dt
 
-    if not datestr.startswith("now"):
-        if datestr.startswith(("-", "+")):
-            datestr = "now" + datestr
-        else:
-            return None
 
-    # Relative datetime string in relation to current day
-    value = re.findall(r"[-+]?[.]?[\d]+(?:,\d\d\d)*[\.]?\d*(?:[eE][-+]?\d+)?|[-+](?=[smhHdWMY])", datestr)
+def _split_quoted_timezone(datestr: str) -> Tuple[str, Optional[str]]:
+    """
+    Splits the first quoted timezone off a shorthand datetime string. Every
+    other copy of the same quoted timezone is removed as well
 
-    if not value:
-        value = [1]
-    if any(v in ("-", "+") for v in value):
-        value = [1] if value[0] == "+" else [-1]
-    if not isinstance(value, list):
-        value = [value]
+    Parameters
+    ----------
+    datestr : str
+        The shorthand datetime string
 
-    unit = re.findall("[smhHdWMY]", datestr)
-    if not isinstance(unit, list):
-        unit = [unit]
+    Returns
+    -------
+    Tuple[str, Optional[str]]
+        The string without the quoted timezone, and the timezone or None if
+        the string contains no quoted text
 
-    timedelta_list = [_timedelta(int(v), u) for v, u in zip(value, unit)]
-    total_timedelta = sum(timedelta_list, datetime.timedelta())
-    dt = dt + total_timedelta
+    Examples
+    --------
+    >>> _split_quoted_timezone('now-1d "Europe/Brussels"')
+    ('now-1d ', 'Europe/Brussels')
+    >>> _split_quoted_timezone("now 'UTC' - 1d")
+    ('now  - 1d', 'UTC')
+    >>> _split_quoted_timezone("now 'UTC' 'UTC'")
+    ('now  ', 'UTC')
+    >>> _split_quoted_timezone('now-1d')
+    ('now-1d', None)
+    """
+    start = -1
+    for i, char in enumerate(datestr):
+        if char == '"' or char == "'":
+            if start == -1:
+                start = i
+            else:
+                tz = datestr[start + 1 : i]
+                rest = datestr[:start] + datestr[i + 1 :]
+                return rest.replace(f'"{tz}"', "").replace(f"'{tz}'", ""), tz
+    return datestr, None
 
-    if target is not None:
-        dt = _roundtimestamp(dt, target[0])
 
-    return dt
+def _current_time(timezone: datetime.tzinfo, now: Optional[datetime.datetime]) -> datetime.datetime:
+    """Returns ``now`` converted to ``timezone``, or the current time in
+    ``timezone`` if ``now`` is None"""
+    if now is None:
+        return datetime.datetime.now(timezone)
+    return now.astimezone(timezone)
 
 
 def _get_timezone(tz: str) -> datetime.tzinfo:
@@ -272,7 +545,14 @@ def _get_timezone(tz: str) -> datetime.tzinfo:
     <UTC>
     """
     try:
-        return pytz.timezone(tz)
+        return _load_timezone(tz)
     except pytz.UnknownTimeZoneError:
-        logging.warning(f"Unknown timezone '{tz}'. Using UTC instead.")
+        logger.warning("Unknown timezone '%s'. Using UTC instead.", tz)
         return pytz.utc
+
+
+@functools.lru_cache(maxsize=64)
+def _load_timezone(tz: str) -> datetime.tzinfo:
+    """Cached :func:`pytz.timezone` lookup. Unknown timezones raise and are
+    therefore not cached, so every such lookup is still reported"""
+    return pytz.timezone(tz)
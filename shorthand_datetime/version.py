@@ -21,11 +21,13 @@ from typing import NamedTuple, Optional
 
 __version__: str = "0.4.0"
 
-_REGEX = "".join(
-    [
-        r"(?P<major>\d+)\.(?P<minor>\d+)\.(?P<patch>\d+)",
-        r"(?:\-(?P<release>.*)\.(?P<num>\d+))?",
-    ]
+_REGEX = re.compile(
+    "".join(
+        [
+            r"(?P<major>\d+)\.(?P<minor>\d+)\.(?P<patch>\d+)",
+            r"(?:\-(?P<release>.*)\.(?P<num>\d+))?",
+        ]
+    )
 )
 
 
@@ -42,7 +44,7 @@ class Version(NamedTuple):
 def parse_version(version: str) -> Version:
     """Converts the given version string to a named tuple per the semantic
     version guidelines"""
-    match = re.search(_REGEX, version)
+    match = _REGEX.match(version)
     if not match:
         raise ValueError(f"Version '{version}' does not comply with the semantic" "versioning naming scheme")
 
@@ -51,11 +53,8 @@ def parse_version(version: str) -> Version:
     patch = int(match.group("patch"))
     release = match.group("release")
 
-    num = None  # type: Optional[int]
-    try:
-        num = int(match.group("num"))
-    except TypeError:
-        pass
+    num_str = match.group("num")
+    num = int(num_str) if num_str is not None else None
 
     return Version(
         major=major,
@@ -1,12 +1,24 @@
 import datetime
-from typing import Optional
+import functools
+from typing import Dict, Optional, Tuple
 from unittest import mock
 
 import pytest
-from hypothesis import given, settings
+import pytz
+from hypothesis import example, given, settings
 from hypothesis import strategies as st
 
+from shorthand_datetime import parse_shorthand_datetime_batch
+from shorthand_datetime.shorthand import _parse_spec, _roundtimestamp, _timedelta, parse_shorthand_datetime
+
 FAKE_TIME: datetime.datetime = datetime.datetime(2024, 11, 15, 17, 5, 55, tzinfo=datetime.timezone.utc)
+# A reference time distinct from FAKE_TIME, so that resolving against the
+# frozen clock instead of the given 'now' cannot pass unnoticed
+REFERENCE_TIME: datetime.datetime = datetime.datetime(2023, 10, 25, 12, 21, 45, tzinfo=datetime.timezone.utc)
+# A naive 'now' is taken to be in local time, whatever that is on this machine
+NAIVE_REFERENCE_TIME: datetime.datetime = REFERENCE_TIME.replace(tzinfo=None)
+# FAKE_TIME converted to each timezone passed to mydatetime.now
+_TZ_CACHE: Dict[datetime.tzinfo, datetime.datetime] = {}
 
 
 # Helper class for datetime patching
@@ -19,231 +31,223 @@ class mydatetime(datetime.datetime):
         Optional[datetime.datetime] is not granted to have the ``year``,
         ``month``, ``day``, ``hour``, ``minute``, and ``second`` attributes.
         """
-        if isinstance(tz, datetime.tzinfo):
-            return FAKE_TIME.astimezone(tz) if tz else FAKE_TIME
-        return FAKE_TIME
-
+        if tz is None:
+            return FAKE_TIME
+        cached = _TZ_CACHE.get(tz)
+        if cached is None:
+            cached = _TZ_CACHE[tz] = FAKE_TIME.astimezone(tz)
+        return cached
 
-def test_shorthand_no_strategies():
-    """Test the shorthand parsing with fixed inputs"""
-    from shorthand_datetime.shorthand import parse_shorthand_datetime
 
+@pytest.fixture(autouse=True, scope="module")
+def _freeze_datetime():
+    """Freezes the current time at FAKE_TIME once for all tests in this module"""
     with mock.patch("datetime.datetime", mydatetime):
-        s = "now+1d"
-        dt_1d = parse_shorthand_datetime(s)
-        assert dt_1d.strftime("%Y%m%d") == "20241116"
-
-        s = "now+7d"
-        dt_7d = parse_shorthand_datetime(s)
-        assert dt_7d.strftime("%Y%m%d") == "20241122"
-
-        s = "now+1W"
-        dt_1W = parse_shorthand_datetime(s)
-        assert dt_1W.strftime("%Y%m%d") == "20241122"
-
-        s = "now+1M"
-        dt_M = parse_shorthand_datetime(s)
-        assert dt_M.strftime("%Y%m%d") == "20241216"
+        yield
 
-        s = "now+1Y"
-        dt_y = parse_shorthand_datetime(s)
-        assert dt_y.strftime("%Y%m%d") == "20251115"
 
-        s = "now-1d"
-        dt_1d = parse_shorthand_datetime(s)
-        assert dt_1d.strftime("%Y%m%d") == "20241114"
-
-        s = "now-7d"
-        dt_7d = parse_shorthand_datetime(s)
-        assert dt_7d.strftime("%Y%m%d") == "20241108"
+@pytest.mark.parametrize(
+    "shorthand, expected",
+    [
+        ("now+1d", (2024, 11, 16)),
+        ("now+7d", (2024, 11, 22)),
+        ("now+1W", (2024, 11, 22)),
+        ("now+1M", (2024, 12, 16)),
+        ("now+1Y", (2025, 11, 15)),
+        ("now-1d", (2024, 11, 14)),
+        ("now-7d", (2024, 11, 8)),
+        ("now-1W", (2024, 11, 8)),
+        ("now-1M", (2024, 10, 16)),
+        ("now-1Y", (2023, 11, 16)),
+    ],
+)
+def test_shorthand_no_strategies(shorthand, expected):
+    """Test the shorthand parsing with fixed inputs"""
+    dt = parse_shorthand_datetime(shorthand)
+    assert (dt.year, dt.month, dt.day) == expected
 
-        s = "now-1W"
-        dt_1W = parse_shorthand_datetime(s)
-        assert dt_1W.strftime("%Y%m%d") == "20241108"
 
-        s = "now-1M"
-        dt_M = parse_shorthand_datetime(s)
-        assert dt_M.strftime("%Y%m%d") == "20241016"
+@pytest.mark.parametrize(
+    "shorthand, expected",
+    [
+        ("now/d", (2024, 11, 15, 0, 0, 0)),
+        ("now/M", (2024, 11, 1, 0, 0, 0)),
+        ("now/Y", (2024, 1, 1, 0, 0, 0)),
+        ("now-2Y/Y", (2022, 1, 1, 0, 0, 0)),
+        ("now-1M/M", (2024, 10, 1, 0, 0, 0)),
+    ],
+)
+def test_rounded_shorthand_no_strategies(shorthand, expected):
+    """Test the shorthand with rounding (e.g., "now/d", "now/M", "now/Y")"""
+    dt = parse_shorthand_datetime(shorthand)
+    assert (dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second) == expected
 
-        s = "now-1Y"
-        dt_y = parse_shorthand_datetime(s)
-        assert dt_y.strftime("%Y%m%d") == "20231116"
 
+def test_patch_datetime():
+    """Test the datetime patching"""
+    now = datetime.datetime.now()
+    assert now == FAKE_TIME
+    assert now.year == FAKE_TIME.year
+    assert now.month == FAKE_TIME.month
+    assert now.day == FAKE_TIME.day
+    assert now.hour == FAKE_TIME.hour
+    assert now.minute == FAKE_TIME.minute
+    assert now.second == FAKE_TIME.second
 
-def test_rounded_shorthand_no_strategies():
-    """Test the shorthand with rounding (e.g., "now/d", "now/M", "now/Y")"""
-    from shorthand_datetime.shorthand import parse_shorthand_datetime
 
-    with mock.patch("datetime.datetime", mydatetime):
-        s = "now/d"
-        dt_d = parse_shorthand_datetime(s)
-        assert dt_d.second == 0
-        assert dt_d.strftime("%Y%m%d_%H%M%S") == "20241115_000000"
+# Strategies are built once at import and shared by every test that draws from them
+_TIME_UNIT = st.sampled_from(("d", "M", "Y"))  # days, months, years
+_MONTH = st.just("M")
 
-        s = "now/M"
-        dt_7d = parse_shorthand_datetime(s)
-        assert dt_7d.strftime("%Y%m%d") == "20241101"
 
-        s = "now/Y"
-        dt_7d = parse_shorthand_datetime(s)
-        assert dt_7d.strftime("%Y%m%d") == "20240101"
+@functools.lru_cache(maxsize=None)
+def _amount(min_value: int, max_value: int) -> st.SearchStrategy:
+    """The (cached) strategy for a random integer amount within the bounds"""
+    return st.integers(min_value=min_value, max_value=max_value)
 
-        s = "now-2Y/Y"
-        dt_7d = parse_shorthand_datetime(s)
-        assert dt_7d.strftime("%Y%m%d") == "20220101"
 
-        s = "now-1M/M"
-        dt_7d = parse_shorthand_datetime(s)
-        assert dt_7d.strftime("%Y%m%d") == "20241001"
+def _case(unit_amount: Tuple[str, int]) -> Tuple[str, int, str]:
+    """Format a (shorthand, amount, unit) case from a drawn (unit, amount) pair"""
+    unit, amount = unit_amount
+    return f"now{amount:+d}{unit}", amount, unit
 
 
-def test_patch_datetime():
-    """Test the datetime patching"""
-    with mock.patch("datetime.datetime", mydatetime):
-        assert datetime.datetime.now() == FAKE_TIME
-        assert datetime.datetime.now().year == FAKE_TIME.year
-        assert datetime.datetime.now().month == FAKE_TIME.month
-        assert datetime.datetime.now().day == FAKE_TIME.day
-        assert datetime.datetime.now().hour == FAKE_TIME.hour
-        assert datetime.datetime.now().minute == FAKE_TIME.minute
-        assert datetime.datetime.now().second == FAKE_TIME.second
-
-
-def generate_shorthand(min_value: int = -600, max_value: int = 600) -> st.SearchStrategy:
-    """Generate shorthand expressions dynamically"""
-    time_unit = st.sampled_from(["d", "M", "Y"])  # days, months, years
+def generate_shorthand(
+    min_value: int = -600, max_value: int = 600, time_unit: st.SearchStrategy = _TIME_UNIT
+) -> st.SearchStrategy:
+    """Generate (shorthand, amount, unit) cases dynamically, so that tests do not
+    need to parse the amount and unit back out of the shorthand"""
     # -- Works until ~600 months (50 years) in the future because of the
     #    approximation in the calculation of months from weeks
-    amount = st.integers(min_value=min_value, max_value=max_value)  # random integer
-    return st.builds(lambda u, a: f"now{a:+d}{u}", time_unit, amount)
+    return st.tuples(time_unit, _amount(min_value, max_value)).map(_case)
 
 
 def generate_rounded_shorthand() -> st.SearchStrategy:
     """Generate rounded shorthand expressions (e.g., now/d, now/M, now/Y)"""
-    time_unit = st.sampled_from(["d", "M", "Y"])
-    return st.builds(lambda u: f"now/{u}", time_unit)
+    return _TIME_UNIT.map("now/{}".format)
 
 
-@given(shorthand=generate_shorthand())
-@settings(max_examples=2000)
-def test_shorthand(shorthand: str):
+@given(case=generate_shorthand())
+@example(case=("now+0d", 0, "d"))
+@example(case=("now-600M", -600, "M"))
+@example(case=("now+600M", 600, "M"))
+@settings(max_examples=200, derandomize=True)
+def test_shorthand(case: Tuple[str, int, str]):
     """Test the shorthand parsing with dynamically generated inputs"""
-    from shorthand_datetime.shorthand import parse_shorthand_datetime
-
-    def get_delta(shorthand: str) -> float:
-        """Extract the delta from the shorthand string"""
-        return float(shorthand.split("-")[1][:-1]) if "-" in shorthand else float(shorthand.split("+")[1][:-1])
-
-    # Apply the patch inside the test so it resets for every hypothesis example
-    with mock.patch("datetime.datetime", mydatetime):
-        dt: Optional[datetime.datetime] = parse_shorthand_datetime(shorthand)
-        if dt is None:
-            pytest.fail(f"parse_shorthand_datetime returned None for shorthand: {shorthand}")
-
-        delta = get_delta(shorthand)
-        # We won't know the exact output since we're generating floats, but we can check the delta
-        if "d" in shorthand:
-            # Extract the number of days from the shorthand string
-            actual_delta = abs(datetime.datetime.now() - dt).total_seconds() / (24 * 60 * 60)  # type: ignore
-        elif "M" in shorthand:
-            # For months, we approximate by comparing the difference in months
-            actual_delta = abs((datetime.datetime.now().year - dt.year) * 12 + datetime.datetime.now().month - dt.month)  # type: ignore
-        elif "Y" in shorthand:
-            # For years, we compare the difference in years
-            actual_delta = abs(datetime.datetime.now().year - dt.year)  # type: ignore
-
-        assert abs(actual_delta - delta) < 1e-1
-        if "+" in shorthand:
-            assert dt >= datetime.datetime.now()  # type: ignore
-        elif "-" in shorthand:
-            assert dt <= datetime.datetime.now()  # type: ignore
-
-
-@given(shorthand=generate_shorthand(min_value=-1000, max_value=-601))
-@settings(max_examples=500)
-def test_shorthand_failure_1(shorthand: str):
+    shorthand, amount, unit = case
+    dt: Optional[datetime.datetime] = parse_shorthand_datetime(shorthand)
+    if dt is None:
+        pytest.fail(f"parse_shorthand_datetime returned None for shorthand: {shorthand}")
+
+    now_dt = datetime.datetime.now()
+    # We won't know the exact output since we're generating floats, but we can check the delta
+    if unit == "d":
+        # Shifting by whole days keeps the time of day, so compare the dates
+        actual_delta = abs(now_dt.toordinal() - dt.toordinal())  # type: ignore
+    elif unit == "M":
+        # For months, we approximate by comparing the difference in months
+        actual_delta = abs((now_dt.year - dt.year) * 12 + now_dt.month - dt.month)  # type: ignore
+    elif unit == "Y":
+        # For years, we compare the difference in years
+        actual_delta = abs(now_dt.year - dt.year)  # type: ignore
+
+    assert abs(actual_delta - abs(amount)) < 1e-1
+    if amount >= 0:
+        assert dt >= now_dt  # type: ignore
+    else:
+        assert dt <= now_dt  # type: ignore
+
+
+@given(case=generate_shorthand(min_value=-1000, max_value=-601, time_unit=_MONTH))
+@example(case=("now-601M", -601, "M"))
+@settings(max_examples=200, derandomize=True)
+def test_shorthand_failure_1(case):
     """Test the shorthand parsing with dynamically generated inputs.
     Expect a ValueError when the value is out of range for large negative values
     of months."""
-    from shorthand_datetime.shorthand import parse_shorthand_datetime
-
-    if "M" in shorthand:
-        with pytest.raises(ValueError):
-            parse_shorthand_datetime(shorthand)
+    shorthand, _, _ = case
+    with pytest.raises(ValueError):
+        parse_shorthand_datetime(shorthand)
 
 
-@given(shorthand=generate_shorthand(min_value=601, max_value=1000))
-@settings(max_examples=500)
-def test_shorthand_failure_2(shorthand: str):
+@given(case=generate_shorthand(min_value=601, max_value=1000, time_unit=_MONTH))
+@example(case=("now+601M", 601, "M"))
+@settings(max_examples=200, derandomize=True)
+def test_shorthand_failure_2(case):
     """Test the shorthand parsing with dynamically generated inputs.
     Expect a ValueError when the value is out of range for large positive values
     of months."""
-    from shorthand_datetime.shorthand import parse_shorthand_datetime
-
-    if "M" in shorthand:
-        with pytest.raises(ValueError):
-            parse_shorthand_datetime(shorthand)
+    shorthand, _, _ = case
+    with pytest.raises(ValueError):
+        parse_shorthand_datetime(shorthand)
 
 
 @given(shorthand=generate_rounded_shorthand())
 def test_rounded_shorthand(shorthand: str):
     """Test the shorthand with rounding (e.g., "now/d", "now/M", "now/Y")"""
-    from shorthand_datetime.shorthand import parse_shorthand_datetime
-
-    # Apply the patch inside the test so it resets for every hypothesis example
-    with mock.patch("datetime.datetime", mydatetime):
-        dt: Optional[datetime.datetime] = parse_shorthand_datetime(shorthand)
-        if dt is None:
-            pytest.fail(f"parse_shorthand_datetime returned None for shorthand: {shorthand}")
+    dt: Optional[datetime.datetime] = parse_shorthand_datetime(shorthand)
+    if dt is None:
+        pytest.fail(f"parse_shorthand_datetime returned None for shorthand: {shorthand}")
 
-        if "/d" in shorthand:
-            # Check if the time is rounded to the start of the day (no hour, minute, second)
-            assert dt.hour == 0 and dt.minute == 0 and dt.second == 0  # type: ignore
-        elif "/M" in shorthand:
-            # Check if the date is rounded to the start of the month (day=1, no hour, minute, second)
-            assert dt.day == 1 and dt.hour == 0 and dt.minute == 0 and dt.second == 0  # type: ignore
-        elif "/Y" in shorthand:
-            # Check if the date is rounded to the start of the year (month=1, day=1, no hour, minute, second)
-            assert dt.month == 1 and dt.day == 1 and dt.hour == 0 and dt.minute == 0 and dt.second == 0  # type: ignore
+    if "/d" in shorthand:
+        # Check if the time is rounded to the start of the day (no hour, minute, second)
+        assert dt.hour == 0 and dt.minute == 0 and dt.second == 0  # type: ignore
+    elif "/M" in shorthand:
+        # Check if the date is rounded to the start of the month (day=1, no hour, minute, second)
+        assert dt.day == 1 and dt.hour == 0 and dt.minute == 0 and dt.second == 0  # type: ignore
+    elif "/Y" in shorthand:
+        # Check if the date is rounded to the start of the year (month=1, day=1, no hour, minute, second)
+        assert dt.month == 1 and dt.day == 1 and dt.hour == 0 and dt.minute == 0 and dt.second == 0  # type: ignore
 
 
 def test_parse_shorthand_datetime_now():
     """Test parsing 'now'"""
-    from shorthand_datetime.shorthand import parse_shorthand_datetime
-
-    with mock.patch("datetime.datetime", mydatetime):
-        dt = parse_shorthand_datetime("now")
-        assert dt == datetime.datetime.now()
+    dt = parse_shorthand_datetime("now")
+    assert dt == datetime.datetime.now()
+    assert dt.tzinfo is not None
+    assert parse_shorthand_datetime(" now ") == dt
+    assert parse_shorthand_datetime("\tnow\n") == dt
+    assert parse_shorthand_datetime("\tnow-1d") == dt - datetime.timedelta(days=1)
+    assert str(parse_shorthand_datetime("now", "America/New_York").tzinfo) == "America/New_York"
+
+
+def _diverging(prefix: str, excluded: str) -> st.SearchStrategy:
+    """Strings that start with ``prefix`` followed by a character that is not
+    in ``excluded``, a quote or whitespace (which the parser would discard),
+    and then free text"""
+    diverging_char = st.characters(blacklist_categories=("Zs", "Zl", "Zp", "Cc"), blacklist_characters=excluded + "\"'")
+    return st.tuples(st.just(prefix), diverging_char, st.text()).map("".join)
+
+
+# Strings that diverge from 'now' (and from a leading sign or '/') within their
+# first three characters, e.g. 'n/a', 'none' or 'yesterday'
+not_a_shorthand = st.one_of(
+    _diverging("", "n-+/"),
+    _diverging("n", "o"),
+    _diverging("no", "w"),
+    st.sampled_from(["n", "no"]),
+)
 
 
-@given(shorthand=st.text(min_size=1).filter(lambda s: not s.startswith(("now", "-", "+", "/"))))
+@given(shorthand=not_a_shorthand)
 def test_parse_shorthand_not_starting_with_now_returns_None(shorthand: str):
     """Test parsing a shorthand that does not start with 'now' returns None"""
-    from shorthand_datetime.shorthand import parse_shorthand_datetime
-
-    with mock.patch("datetime.datetime", mydatetime):
-        dt = parse_shorthand_datetime(shorthand)
-        assert dt is None
+    dt = parse_shorthand_datetime(shorthand)
+    assert dt is None
 
 
 @given(shorthand=st.sampled_from(["-", "+"]))
 def test_parse_shorthand_starting_with_unit_returns_now(shorthand: str):
     """Test parsing a shorthand that starts with a unit returns the current datetime"""
-    from shorthand_datetime.shorthand import parse_shorthand_datetime
-
-    with mock.patch("datetime.datetime", mydatetime):
-        dt = parse_shorthand_datetime(shorthand)
-        assert dt == datetime.datetime.now()
+    dt = parse_shorthand_datetime(shorthand)
+    assert dt == datetime.datetime.now()
 
 
 @given(shorthand=st.sampled_from(["/"]))
 def test_parse_shorthand_starting_with_unit_returns_none(shorthand: str):
     """Test parsing a shorthand that starts with a unit returns the current datetime"""
-    from shorthand_datetime.shorthand import parse_shorthand_datetime
-
-    with mock.patch("datetime.datetime", mydatetime):
-        dt = parse_shorthand_datetime(shorthand)
-        assert dt is None
+    dt = parse_shorthand_datetime(shorthand)
+    assert dt is None
 
 
 @given(
@@ -265,56 +269,45 @@ def test_parse_shorthand_starting_with_unit_returns_none(shorthand: str):
 )
 def test_parse_shorthand_with_spaces(shorthand: str):
     """Test parsing a shorthand with spaces"""
-    from shorthand_datetime.shorthand import parse_shorthand_datetime
-
     expected_results = {
-        "now + 1d": "20241116",
-        "now - 1d": "20241114",
-        "now - 1M": "20241016",
-        "now - 1Y": "20231116",
-        "now + 1M": "20241216",
-        "now + 1Y": "20251115",
-        "now / d": "20241115_000000",
-        "now / M": "20241101_000000",
-        "now / Y": "20240101_000000",
-        "now - 2Y / Y": "20220101_000000",
-        "now - 1M / M": "20241001_000000",
+        "now + 1d": (2024, 11, 16),
+        "now - 1d": (2024, 11, 14),
+        "now - 1M": (2024, 10, 16),
+        "now - 1Y": (2023, 11, 16),
+        "now + 1M": (2024, 12, 16),
+        "now + 1Y": (2025, 11, 15),
+        "now / d": (2024, 11, 15, 0, 0, 0),
+        "now / M": (2024, 11, 1, 0, 0, 0),
+        "now / Y": (2024, 1, 1, 0, 0, 0),
+        "now - 2Y / Y": (2022, 1, 1, 0, 0, 0),
+        "now - 1M / M": (2024, 10, 1, 0, 0, 0),
     }
 
-    with mock.patch("datetime.datetime", mydatetime):
-        dt = parse_shorthand_datetime(shorthand)
-        if " / " in shorthand:
-            assert dt.second == 0  # type: ignore
-            assert dt.strftime("%Y%m%d_%H%M%S") == expected_results[shorthand]  # type: ignore
-        else:
-            assert dt.strftime("%Y%m%d") == expected_results[shorthand]  # type: ignore
+    dt = parse_shorthand_datetime(shorthand)
+    if " / " in shorthand:
+        assert dt.second == 0  # type: ignore
+        assert (dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second) == expected_results[shorthand]  # type: ignore
+    else:
+        assert (dt.year, dt.month, dt.day) == expected_results[shorthand]  # type: ignore
 
 
 @given(target=st.sampled_from(["s", "m", "h", "H", "d", "W", "M", "Y"]))
 def test__roundtimestamp_valid(target):
     """Test the _roundtimestamp function with valid targets"""
-    from shorthand_datetime.shorthand import _roundtimestamp
-
-    with mock.patch("datetime.datetime", mydatetime):
-        result = _roundtimestamp(datetime.datetime.now(), target)
-        assert result.__class__.__name__ == "datetime"
+    result = _roundtimestamp(datetime.datetime.now(), target)
+    assert result.__class__.__name__ == "datetime"
 
 
 @given(target=st.text().filter(lambda x: x not in ["s", "m", "h", "H", "d", "W", "M", "Y"]))
 def test__roundtimestamp_invalid(target):
     """Test the _roundtimestamp function with invalid targets"""
-    from shorthand_datetime.shorthand import _roundtimestamp
-
-    with mock.patch("datetime.datetime", mydatetime):
-        with pytest.raises(ValueError):
-            _roundtimestamp(datetime.datetime.now(), target)
+    with pytest.raises(ValueError):
+        _roundtimestamp(datetime.datetime.now(), target)
 
 
 @given(unit=st.sampled_from(["s", "m", "h", "H", "d", "W", "M", "Y"]))
 def test__timedelta_valid(unit):
     """Test the _timedelta function with valid units"""
-    from shorthand_datetime.shorthand import _timedelta
-
     result = _timedelta(1, unit)
     assert result.__class__.__name__ == "timedelta"
 
@@ -322,120 +315,185 @@ def test__timedelta_valid(unit):
 @given(unit=st.text().filter(lambda x: x not in ["s", "m", "h", "H", "d", "W", "M", "Y"]))
 def test__timedelta_invalid(unit):
     """Test the _timedelta function with invalid units"""
-    from shorthand_datetime.shorthand import _timedelta
-
     with pytest.raises(ValueError):
         _timedelta(1, unit)
 
 
 def test__backslash_not_second_to_last():
     """Test the _backslash_not_second_to_last function"""
-    from shorthand_datetime.shorthand import parse_shorthand_datetime
-
     dt = parse_shorthand_datetime("now / ")
     assert dt is None
     dt = parse_shorthand_datetime("now /d")
-    assert isinstance(dt, datetime.datetime)
+    assert dt is not None
     dt = parse_shorthand_datetime("now /d/")
     assert dt is None
 
 
+@pytest.fixture(scope="session")
+def zones():
+    """The timezones used in the timezone tests, loaded once per session"""
+    names = [
+        "UTC",
+        "America/New_York",
+        "Europe/London",
+        "Asia/Tokyo",
+        "Australia/Sydney",
+        "Europe/Berlin",
+        "America/Los_Angeles",
+    ]
+    return {name: pytz.timezone(name) for name in names}
+
+
 @pytest.mark.parametrize(
-    "datestr, tz, expected",
+    "datestr, tz, expected_ymdhms, expected_tz",
     [
-        ("now", "UTC", "20241115_170555"),
-        ("now", "America/New_York", "20241115_120555"),
-        ("now-6d/d", "UTC", "20241109_000000"),
-        ("now-1W", "America/New_York", "20241108_120555"),
-        ("now-2M", "UTC", "20240915_210552"),
-        ("now-1M/M", "America/New_York", "20241001_000000"),
-        ("now-3Y", "UTC", "20211115_234907"),
-        ("now/d", "America/New_York", "20241115_000000"),
-        ("now/M", "UTC", "20241101_000000"),
-        ("now/Y", "America/New_York", "20240101_000000"),
+        ("now", "UTC", (2024, 11, 15, 17, 5, 55), "UTC"),
+        ("now", "America/New_York", (2024, 11, 15, 12, 5, 55), "America/New_York"),
+        ("now-6d/d", "UTC", (2024, 11, 9, 0, 0, 0), "UTC"),
+        ("now-1W", "America/New_York", (2024, 11, 8, 12, 5, 55), "America/New_York"),
+        ("now-2M", "UTC", (2024, 9, 15, 21, 5, 52), "UTC"),
+        ("now-1M/M", "America/New_York", (2024, 10, 1, 0, 0, 0), "America/New_York"),
+        ("now-3Y", "UTC", (2021, 11, 15, 23, 49, 7), "UTC"),
+        ("now/d", "America/New_York", (2024, 11, 15, 0, 0, 0), "America/New_York"),
+        ("now/M", "UTC", (2024, 11, 1, 0, 0, 0), "UTC"),
+        ("now/Y", "America/New_York", (2024, 1, 1, 0, 0, 0), "America/New_York"),
+        ('now "UTC"', None, (2024, 11, 15, 17, 5, 55), "UTC"),
+        ("now 'America/New_York'", None, (2024, 11, 15, 12, 5, 55), "America/New_York"),
+        ('now-6d/d "Europe/London"', None, (2024, 11, 9, 0, 0, 0), "Europe/London"),
+        ("now-1W 'Asia/Tokyo'", None, (2024, 11, 9, 2, 5, 55), "Asia/Tokyo"),
+        ('now-2M "Australia/Sydney"', None, (2024, 9, 16, 8, 5, 52), "Australia/Sydney"),
+        ("now-1M/M 'Europe/Berlin'", None, (2024, 10, 1, 0, 0, 0), "Europe/Berlin"),
+        ('now-3Y "America/Los_Angeles"', None, (2021, 11, 15, 15, 49, 7), "America/Los_Angeles"),
+        ("now 'UTC' - 1d", None, (2024, 11, 14, 17, 5, 55), "UTC"),
+        ("now 'America/New_York' - 1d", None, (2024, 11, 14, 12, 5, 55), "America/New_York"),
+        ("now 'UTC' 'UTC'", None, (2024, 11, 15, 17, 5, 55), "UTC"),
+        ("now-1d \"Asia/Tokyo\" 'Asia/Tokyo'", None, (2024, 11, 15, 2, 5, 55), "Asia/Tokyo"),
     ],
 )
-def test_parse_shorthand_datetime_with_timezone(datestr, tz, expected):
-    """Test parse_shorthand_datetime with various inputs and timezones"""
-    from shorthand_datetime.shorthand import parse_shorthand_datetime
+def test_parse_shorthand_datetime_with_timezone(datestr, tz, expected_ymdhms, expected_tz, zones):
+    """Test parse_shorthand_datetime with timezones passed as argument or quoted in the string"""
+    dt = parse_shorthand_datetime(datestr, tz)
+    tzname = str(dt.tzinfo)
+    assert (dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second) == expected_ymdhms
+    assert tzname == str(zones[expected_tz])
 
-    with mock.patch("datetime.datetime", mydatetime):
-        dt = parse_shorthand_datetime(datestr, tz)
-        assert dt.strftime("%Y%m%d_%H%M%S") == expected
 
-    @pytest.mark.parametrize(
-        "datestr",
-        [
-            "now-6d/d/d",
-            "now-1W/W",
-            "now-2M/M/M",
-            "now-1M/M/M",
-            "now-3Y/Y/Y",
-            "now/d/d",
-            "now/M/M",
-            "now/Y/Y",
-        ],
-    )
-    def test_parse_shorthand_datetime_invalid(datestr):
-        """Test parse_shorthand_datetime with invalid inputs"""
-        from shorthand_datetime.shorthand import parse_shorthand_datetime
+@pytest.mark.parametrize(
+    "datestr",
+    [
+        "now-6d/d/d",
+        "now-2M/M/M",
+        "now-1M/M/M",
+        "now-3Y/Y/Y",
+        "now/d/d",
+        "now/M/M",
+        "now/Y/Y",
+    ],
+)
+def test_parse_shorthand_datetime_invalid(datestr):
+    """Test parse_shorthand_datetime with more than one rounding target"""
+    assert parse_shorthand_datetime(datestr) is None
 
-        with mock.patch("datetime.datetime", mydatetime):
-            dt = parse_shorthand_datetime(datestr)
-            assert dt is None
 
-    @pytest.mark.parametrize(
-        "datestr, expected",
-        [
-            ("now+1d", "20241116_170555"),
-            ("now+7d", "20241122_170555"),
-            ("now+1W", "20241122_170555"),
-            ("now+1M", "20241215_170555"),
-            ("now+1Y", "20251115_170555"),
-            ("now-1d", "20241114_170555"),
-            ("now-7d", "20241108_170555"),
-            ("now-1W", "20241108_170555"),
-            ("now-1M", "20241015_170555"),
-            ("now-1Y", "20231115_170555"),
-        ],
-    )
-    def test_parse_shorthand_datetime_relative(datestr, expected):
-        """Test parse_shorthand_datetime with relative inputs"""
-        from shorthand_datetime.shorthand import parse_shorthand_datetime
-
-        with mock.patch("datetime.datetime", mydatetime):
-            dt = parse_shorthand_datetime(datestr)
-            assert dt.strftime("%Y%m%d_%H%M%S") == expected
+def test_warning_timezone_passed_twice():
+    """Test the warning when the timezone is passed as an argument and in the date string"""
+    with pytest.warns(UserWarning):
+        dt = parse_shorthand_datetime('now-6d/d "UTC"', "America/New_York")
+        assert (dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second) == (2024, 11, 9, 0, 0, 0)
 
 
 @pytest.mark.parametrize(
-    "datestr, expected_tz",
+    "datestr, expected",
     [
-        ('now "UTC"', "UTC"),
-        ("now 'America/New_York'", "America/New_York"),
-        ('now-6d/d "Europe/London"', "Europe/London"),
-        ("now-1W 'Asia/Tokyo'", "Asia/Tokyo"),
-        ('now-2M "Australia/Sydney"', "Australia/Sydney"),
-        ("now-1M/M 'Europe/Berlin'", "Europe/Berlin"),
-        ('now-3Y "America/Los_Angeles"', "America/Los_Angeles"),
-        ("now 'UTC' - 1d", "UTC"),
-        ("now 'America/New_York' - 1d", "America/New_York"),
+        ("now-3W+6h", (2024, 10, 25, 23, 5, 55)),
+        ("now-1M+1W/d", (2024, 10, 23, 0, 0, 0)),
+        ("now-d", (2024, 11, 14, 17, 5, 55)),
+        ("now+h", (2024, 11, 15, 18, 5, 55)),
+        ("now-1.5d", None),
+        ("now-1x", None),
+        ("now-1d\n", (2024, 11, 14, 17, 5, 55)),
+        ("now-1d\r\n", (2024, 11, 14, 17, 5, 55)),
+        ("now\xa0-1d", (2024, 11, 14, 17, 5, 55)),
+        ("now-6d/d\t", (2024, 11, 9, 0, 0, 0)),
+        (" n o w", (2024, 11, 15, 17, 5, 55)),
+        ("n o w-1d", (2024, 11, 14, 17, 5, 55)),
     ],
 )
-def test_parse_shorthand_datetime_with_quoted_timezone(datestr, expected_tz):
-    """Test parse_shorthand_datetime with quoted timezone"""
-    from shorthand_datetime.shorthand import _get_timezone, parse_shorthand_datetime
+def test_parse_shorthand_datetime_compound(datestr, expected):
+    """Test parse_shorthand_datetime with compound, implicit and malformed terms"""
+    dt = parse_shorthand_datetime(datestr)
+    if expected is None:
+        assert dt is None
+    else:
+        assert (dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second) == expected
+
+
+def test_parse_shorthand_datetime_batch():
+    """Test that the batch parser matches the single-string parser"""
+
+    datestrs = [
+        "now",
+        "now-6d/d",
+        "now-1W",
+        "now-2M",
+        "now-3W+6h",
+        "now-1M/M",
+        "now/d/d",
+        "yesterday",
+        "now-6d/d",
+        "now",
+    ]
+    for tz in (None, "America/New_York"):
+        expected = [parse_shorthand_datetime(datestr, tz) for datestr in datestrs]
+        assert parse_shorthand_datetime_batch(datestrs, tz) == expected
+    with pytest.raises(ValueError):
+        parse_shorthand_datetime_batch(["now", "now-700M"])
 
-    with mock.patch("datetime.datetime", mydatetime):
-        dt = parse_shorthand_datetime(datestr)
-        assert str(dt.tzinfo) == str(_get_timezone(expected_tz))
 
+def test_parse_shorthand_datetime_batch_reads_clock_once():
+    """Test that the batch parser reads the clock once for the whole batch"""
+    ticks = iter(range(100))
 
-def test_warning_timezone_passed_twice():
-    """Test the warning when the timezone is passed as an argument and in the date string"""
-    from shorthand_datetime.shorthand import parse_shorthand_datetime
+    def ticking_now(tz=None):
+        return FAKE_TIME + datetime.timedelta(seconds=next(ticks))
 
-    with mock.patch("datetime.datetime", mydatetime):
-        with pytest.warns(UserWarning):
-            dt = parse_shorthand_datetime('now-6d/d "UTC"', "America/New_York")
-            assert dt.strftime("%Y%m%d_%H%M%S") == "20241109_000000"
+    with mock.patch.object(mydatetime, "now", side_effect=ticking_now) as clock:
+        dt_now, dt_now_s, dt_yesterday = parse_shorthand_datetime_batch(["now", "now/s", "now-1d"])
+    assert clock.call_count == 1
+    assert dt_now == dt_now_s
+    assert dt_yesterday == dt_now - datetime.timedelta(days=1)
+
+    # An explicit 'now' is used for every string, and the clock is not read
+    with mock.patch.object(mydatetime, "now", side_effect=ticking_now) as clock:
+        result = parse_shorthand_datetime_batch(["now", "now/s", "now-1d"], now=REFERENCE_TIME)
+    assert clock.call_count == 0
+    assert result == [REFERENCE_TIME, REFERENCE_TIME, REFERENCE_TIME - datetime.timedelta(days=1)]
+
+
+def test_parse_spec_is_cached():
+    """Test that repeated shorthands reuse the parsed spec instead of scanning again"""
+    _parse_spec.cache_clear()
+    first = parse_shorthand_datetime("now-17d+3h/h")
+    assert _parse_spec.cache_info().misses == 1
+    assert parse_shorthand_datetime("now-17d+3h/h") == first
+    assert _parse_spec.cache_info().hits == 1
+
+
+_NAIVE_MINUS_1D = NAIVE_REFERENCE_TIME.astimezone(datetime.timezone.utc) - datetime.timedelta(days=1)
+
+
+@pytest.mark.parametrize(
+    "datestr, tz, now, expected",
+    [
+        ("now", None, REFERENCE_TIME, (2023, 10, 25, 12, 21, 45)),
+        ("now-1d", None, REFERENCE_TIME, (2023, 10, 24, 12, 21, 45)),
+        ("now-6d/d", None, REFERENCE_TIME, (2023, 10, 19, 0, 0, 0)),
+        ("now-1W", "America/New_York", REFERENCE_TIME, (2023, 10, 18, 8, 21, 45)),
+        ("now/d 'America/New_York'", None, REFERENCE_TIME, (2023, 10, 25, 0, 0, 0)),
+        ("now-1d", None, NAIVE_REFERENCE_TIME, _NAIVE_MINUS_1D.timetuple()[:6]),
+    ],
+)
+def test_parse_shorthand_datetime_with_now(datestr, tz, now, expected):
+    """Test parse_shorthand_datetime resolving against an explicit 'now'"""
+    dt = parse_shorthand_datetime(datestr, tz, now=now)
+    assert (dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second) == expected